@@ -1,53 +1,233 @@
 from __future__ import annotations
 
+import asyncio
+import importlib.metadata
 import logging
 import os
 import time
-import asyncio
+from collections.abc import Coroutine
+from dataclasses import dataclass
 from typing import Any
-import importlib.metadata
 
 import httpx
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
-from .flink_sql_gateway_client import FlinkSqlGatewayClient
+from .flink_sql_gateway_client import (
+    TERMINAL_STATUSES,
+    FlinkSqlGatewayClient,
+    extract_operation_handle,
+    operation_status,
+)
+
+_DOTENV_LOADED = False
+
+# Status polling backs off geometrically from the initial interval up to the cap.
+POLL_INITIAL_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 2.0
+POLL_MULTIPLIER = 1.5
+
+# STOP JOB usually completes quickly, so its status is polled on a finer grain.
+STOP_POLL_INITIAL_INTERVAL = 0.01
+STOP_POLL_MAX_INTERVAL = 0.5
+STOP_POLL_MULTIPLIER = 2.0
+
+# Each DESCRIBE JOB check is a full statement round trip, so it backs off faster.
+JOB_POLL_MULTIPLIER = 2.0
+
+# Result fetches ask the gateway to long-poll; the client-side backoff is a fallback.
+FETCH_MAX_WAIT_MS = 1000
+FETCH_MAX_INTERVAL = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class FlinkConfig:
+    """Server settings, read once from the environment by ``_from_env``."""
+
+    base_url: str | None = None
+    poll_initial: float = POLL_INITIAL_INTERVAL
+    poll_max: float = POLL_MAX_INTERVAL
+    fetch_max_wait_ms: int = FETCH_MAX_WAIT_MS
+
+    def __post_init__(self) -> None:
+        # A zero interval never grows under backoff and turns polling into a busy loop.
+        if not self.poll_initial > 0:
+            raise ValueError(
+                f"poll_initial (FLINK_POLL_INITIAL) must be > 0, got {self.poll_initial}"
+            )
+        if not self.poll_max >= self.poll_initial:
+            raise ValueError(
+                "poll_max (FLINK_POLL_MAX) must be >= poll_initial "
+                f"({self.poll_initial}), got {self.poll_max}"
+            )
+        if self.fetch_max_wait_ms < 0:
+            raise ValueError(
+                "fetch_max_wait_ms (FLINK_FETCH_MAX_WAIT_MS) must be >= 0, "
+                f"got {self.fetch_max_wait_ms}"
+            )
+
+
+def _env_number(name: str, default: float, kind: type[float | int]) -> Any:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return kind(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a {kind.__name__}, got {raw!r}") from None
+
+
+def _from_env() -> FlinkConfig:
+    return FlinkConfig(
+        base_url=os.environ.get("SQL_GATEWAY_API_BASE_URL"),
+        poll_initial=_env_number("FLINK_POLL_INITIAL", POLL_INITIAL_INTERVAL, float),
+        poll_max=_env_number("FLINK_POLL_MAX", POLL_MAX_INTERVAL, float),
+        fetch_max_wait_ms=_env_number(
+            "FLINK_FETCH_MAX_WAIT_MS", FETCH_MAX_WAIT_MS, int
+        ),
+    )
+
+
+# Gateway responses use these canonical uppercase values; compare against them
+# directly and only normalize case for anything unexpected.
+_EOS = "EOS"
+_NOT_READY = "NOT_READY"
+_PAYLOAD = "PAYLOAD"
+_RESULT_TYPES = frozenset({_EOS, _NOT_READY, _PAYLOAD})
+
+# Globally terminal Flink job states, as reported by a STOP operation's payload.
+_STOPPED_JOB_STATUSES = frozenset({"FINISHED", "CANCELED", "FAILED", "SUSPENDED"})
+
+
+def _result_type(page: dict[str, Any]) -> str:
+    """Return the page resultType, upper-casing only non-canonical values."""
+    rtype = page.get("resultType")
+    if isinstance(rtype, str) and rtype in _RESULT_TYPES:
+        return rtype
+    return str(rtype or "").upper()
+
+
+def _stopped_job_status(payload: dict[str, Any]) -> str | None:
+    """Return the job status from a STOP operation payload if it is terminal."""
+    job_status = payload.get("jobStatus")
+    if isinstance(job_status, str) and job_status.upper() in _STOPPED_JOB_STATUSES:
+        return job_status
+    return None
 
 
 def build_server(
     base_url: str | None = None,
     http_client: httpx.AsyncClient | None = None,
+    *,
+    client: FlinkSqlGatewayClient | None = None,
+    config: FlinkConfig | None = None,
 ) -> FastMCP:
-    load_dotenv()
+    if client is not None and (base_url is not None or http_client is not None):
+        raise TypeError("pass either client or base_url/http_client, not both")
+
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv()
+        _DOTENV_LOADED = True
 
     version = importlib.metadata.version("flink-mcp")
     server = FastMCP(f"Flink SQLGateway MCP Server v{version}")
 
     logger = logging.getLogger(__name__)
 
-    # Allow tests to inject a mocked HTTP client and/or base URL.
-    effective_base_url = base_url or os.getenv("SQL_GATEWAY_API_BASE_URL")
-    client = FlinkSqlGatewayClient(effective_base_url, client=http_client)
-
-    async def _poll_status(
-        session_handle: str, operation_handle: str, timeout: float, interval: float
-    ) -> tuple[str, dict[str, Any]]:
-        end = time.time() + timeout
-        last_payload: dict[str, Any] = {}
-        while time.time() < end:
-            last_payload = await client.get_operation_status(
-                session_handle, operation_handle
-            )
-            status = str(last_payload.get("status", "")).upper()
-            if status in {"FINISHED", "ERROR", "CANCELED", "CLOSED"}:
-                return status, last_payload
-            await asyncio.sleep(interval)
-        return "TIMEOUT", last_payload
+    # Allow tests to inject a mocked HTTP client and/or base URL; callers that
+    # want several servers on one connection pool pass a shared client.
+    cfg = config or _from_env()
+    poll_initial_interval = cfg.poll_initial
+    poll_max_interval = cfg.poll_max
+    if client is None:
+        effective_base_url = base_url or cfg.base_url
+        client = FlinkSqlGatewayClient(effective_base_url, client=http_client)
 
     def _extract_job_id(page: dict[str, Any]) -> str | None:
         j = page.get("jobID") or page.get("jobId")
         return j if isinstance(j, str) else None
 
+    async def _fetch_until_ready(
+        session_handle: str,
+        operation_handle: str,
+        token: int,
+        deadline: float,
+        *,
+        max_wait_ms: int = cfg.fetch_max_wait_ms,
+        accept_job_id: bool = False,
+    ) -> dict[str, Any]:
+        """Fetch a result page, retrying with backoff while the gateway reports NOT_READY.
+
+        With accept_job_id, a NOT_READY page that already carries a jobID is returned.
+        Returns the last page seen, which is still NOT_READY if the deadline passed.
+        """
+        interval = poll_initial_interval
+        while True:
+            page = await client.fetch_result(
+                session_handle, operation_handle, token=token, max_wait_ms=max_wait_ms
+            )
+            rtype = _result_type(page)
+            if rtype != _NOT_READY or (accept_job_id and _extract_job_id(page)):
+                return page
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return page
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * POLL_MULTIPLIER, FETCH_MAX_INTERVAL)
+
+    async def _wait_and_fetch_first_page(
+        session_handle: str,
+        operation_handle: str,
+        deadline: float,
+        *,
+        accept_job_id: bool = False,
+    ) -> tuple[str, dict[str, Any], dict[str, Any]]:
+        """Wait for the first result page, using the fetch itself as completion signal.
+
+        NOT_READY means the operation is still running, so no separate status polling
+        is needed. Returns (status, status_payload, page0): "FINISHED" once token 0
+        yields PAYLOAD or EOS, "TIMEOUT" if it is still NOT_READY at the deadline, and
+        the operation's terminal status (looked up once) if the gateway returned an
+        error envelope instead of a page.
+        """
+        try:
+            page0 = await _fetch_until_ready(
+                session_handle,
+                operation_handle,
+                0,
+                deadline,
+                accept_job_id=accept_job_id,
+            )
+        except Exception as e:
+            page0 = {"errors": [str(e)]}
+        rtype = _result_type(page0)
+        if rtype in (_PAYLOAD, _EOS) or (accept_job_id and _extract_job_id(page0)):
+            return "FINISHED", {}, page0
+        if rtype == _NOT_READY:
+            return "TIMEOUT", {}, page0
+        try:
+            status_payload = await client.get_operation_status(
+                session_handle, operation_handle
+            )
+        except Exception:
+            status_payload = {}
+        status = operation_status(status_payload)
+        if status == "FINISHED" or status not in TERMINAL_STATUSES:
+            status = "ERROR"
+        return status, status_payload, page0
+
+    def _operation_error(
+        status: str, status_payload: dict[str, Any], page0: dict[str, Any]
+    ) -> dict[str, Any]:
+        return {
+            "errorType": f"OPERATION_{status}",
+            "message": "operation did not finish successfully",
+            "status": status,
+            "statusPayload": status_payload,
+            "errorPage0": page0,
+        }
+
     async def _job_status(session_handle: str, job_id: str) -> str | None:
         """Return current cluster job status via DESCRIBE JOB, or None if unavailable.
 
@@ -57,28 +237,28 @@ def build_server(
             exec_resp = await client.execute_statement(
                 session_handle, f"DESCRIBE JOB '{job_id}'"
             )
-            op = exec_resp.get("operationHandle") or exec_resp.get("operation_handle")
-            if isinstance(op, dict):
-                op = op.get("identifier") or op.get("handle") or op.get("id")
-            if not isinstance(op, str):
+            op = extract_operation_handle(exec_resp)
+            if op is None:
                 return None
-            status, _ = await _poll_status(session_handle, op, 10.0, 0.5)
+            status, _, page0 = await _wait_and_fetch_first_page(
+                session_handle, op, time.monotonic() + 10.0
+            )
             if status != "FINISHED":
                 return None
-            page0 = await client.fetch_result(session_handle, op, token=0)
-            results = page0.get("results") or {}
-            columns: list[dict[str, Any]] = results.get("columns") or []
-            status_idx = None
-            for idx, col in enumerate(columns):
-                try:
-                    if str(col.get("name")).strip().lower() == "status":
-                        status_idx = idx
-                        break
-                except Exception:
-                    continue
+            try:
+                results = page0["results"]
+                columns: list[dict[str, Any]] = results["columns"]
+                rows: list[dict[str, Any]] = results["data"]
+            except (KeyError, TypeError):
+                return None
+            name_to_idx = {
+                str(col.get("name", "")).strip().lower(): idx
+                for idx, col in enumerate(columns)
+                if isinstance(col, dict)
+            }
+            status_idx = name_to_idx.get("status")
             if status_idx is None:
                 return None
-            rows: list[dict[str, Any]] = results.get("data") or []
             if not rows:
                 return None
             first = rows[0]
@@ -91,7 +271,7 @@ def build_server(
             return None
 
     async def _submit_stop_job(
-        session_handle: str, job_id: str, timeout: float = 30.0, interval: float = 0.5
+        session_handle: str, job_id: str, timeout: float = 30.0
     ) -> tuple[str, dict[str, Any]] | None:
         """Submit STOP JOB for a given job and poll the stop operation until terminal status.
 
@@ -100,31 +280,52 @@ def build_server(
         stop_exec = await client.execute_statement(
             session_handle, f"STOP JOB '{job_id}'"
         )
-        stop_op = stop_exec.get("operationHandle") or stop_exec.get("operation_handle")
-        if isinstance(stop_op, dict):
-            stop_op = (
-                stop_op.get("identifier") or stop_op.get("handle") or stop_op.get("id")
+        stop_op = extract_operation_handle(stop_exec)
+        if stop_op is not None:
+            return await client.wait_for_status(
+                session_handle,
+                stop_op,
+                timeout=timeout,
+                initial=min(STOP_POLL_INITIAL_INTERVAL, poll_initial_interval),
+                maximum=min(STOP_POLL_MAX_INTERVAL, poll_max_interval),
+                factor=STOP_POLL_MULTIPLIER,
             )
-        if isinstance(stop_op, str):
-            return await _poll_status(session_handle, stop_op, timeout, interval)
         return None
 
+    # Strong references keep background cleanup tasks alive until they finish.
+    background_tasks: set[asyncio.Task[Any]] = set()
+
+    def _on_background_done(task: asyncio.Task[Any]) -> None:
+        background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("background cleanup failed: %s", task.exception())
+
+    def _fire_and_forget(coro: Coroutine[Any, Any, Any]) -> None:
+        """Run cleanup off the caller's path, logging rather than raising failures."""
+        task = asyncio.create_task(coro)
+        background_tasks.add(task)
+        task.add_done_callback(_on_background_done)
+
     async def _wait_job_stopped(
-        session_handle: str, job_id: str, timeout: float = 60.0, interval: float = 1.0
+        session_handle: str, job_id: str, timeout: float = 60.0
     ) -> tuple[bool, str | None]:
         """Wait until DESCRIBE JOB reports the job is not RUNNING (or job is gone).
 
+        Each check is a full statement round trip, so the interval doubles from the
+        initial poll interval up to the poll cap.
         Returns (job_gone, last_status).
         """
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
+        interval = poll_initial_interval
         job_gone = False
         last_status: str | None = None
-        while time.time() < deadline:
+        while time.monotonic() < deadline:
             last_status = await _job_status(session_handle, job_id)
             if last_status is None or str(last_status).strip().upper() != "RUNNING":
                 job_gone = True
                 break
-            await asyncio.sleep(interval)
+            await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(interval * JOB_POLL_MULTIPLIER, poll_max_interval)
         return job_gone, last_status
 
     @server.resource("https://mcp.local/flink/info")
@@ -162,7 +363,7 @@ def build_server(
 
         Returns a compact payload: { "columns": [...], "data": [...] }.
         """
-        deadline = time.time() + max_seconds
+        deadline = time.monotonic() + max_seconds
 
         try:
             exec_resp = await client.execute_statement(session_handle, query)
@@ -171,70 +372,62 @@ def build_server(
                 "errorType": "EXECUTE_EXCEPTION",
                 "message": str(e),
             }
-        op = exec_resp.get("operationHandle")
-        if not isinstance(op, str):
+        op = extract_operation_handle(exec_resp)
+        if op is None:
             return {
                 "errorType": "NO_OPERATION_HANDLE",
                 "message": "execute returned no handle",
             }
 
-        status, status_payload = await _poll_status(
-            session_handle, op, max(0.0, deadline - time.time()), 0.5
+        status, status_payload, page = await _wait_and_fetch_first_page(
+            session_handle, op, deadline
         )
         if status != "FINISHED":
-            err: dict[str, Any] = {
-                "errorType": f"OPERATION_{status}",
-                "message": "operation did not finish successfully",
-                "status": status,
-                "statusPayload": status_payload,
-            }
-            try:
-                err_page0 = await client.fetch_result(session_handle, op, token=0)
-                err["errorPage0"] = err_page0
-            except Exception:
-                pass
-            return err
+            return _operation_error(status, status_payload, page)
 
         data_accum: list[Any] = []
         columns: list[Any] | None = None
         token = 0
-        jid: str | None = None
+        jid = _extract_job_id(page)
 
-        while len(data_accum) < max_rows and time.time() < deadline:
-            page = await client.fetch_result(session_handle, op, token=token)
+        while len(data_accum) < max_rows:
             if jid is None:
                 jid = _extract_job_id(page)
-            rtype = str(page.get("resultType") or "").upper()
-            if rtype == "NOT_READY":
-                await asyncio.sleep(0.25)
-                continue
+            rtype = _result_type(page)
+            if rtype == _NOT_READY:
+                break
 
-            res = page.get("results") or {}
             if columns is None:
-                cols = res.get("columns") or []
+                try:
+                    cols = page["results"]["columns"]
+                except (KeyError, TypeError):
+                    cols = None
                 if isinstance(cols, list) and cols:
                     columns = cols
 
-            page_data: list[Any] = res.get("data") or []
+            try:
+                page_data = page["results"]["data"]
+            except (KeyError, TypeError):
+                page_data = None
             if isinstance(page_data, list) and page_data:
                 need = max_rows - len(data_accum)
                 if need > 0:
                     data_accum.extend(page_data[:need])
-                # Stop polling as soon as we reached the quota
-                if len(data_accum) >= max_rows:
-                    break
 
             token += 1
-            if rtype == "EOS":
+            # Stop polling as soon as we reached the quota
+            if (
+                rtype == _EOS
+                or len(data_accum) >= max_rows
+                or time.monotonic() >= deadline
+            ):
                 break
+            page = await _fetch_until_ready(session_handle, op, token, deadline)
 
         if jid:
-            await _submit_stop_job(session_handle, jid, 30.0, 0.5)
-
-        try:
-            await client.close_operation(session_handle, op)
-        except Exception:
-            pass
+            await _submit_stop_job(session_handle, jid, 30.0)
+        # Closing the operation is cleanup only; keep it off the response path
+        _fire_and_forget(client.close_operation(session_handle, op))
 
         return {"columns": (columns or []), "data": data_accum}
 
@@ -249,40 +442,21 @@ def build_server(
                 "errorType": "EXECUTE_EXCEPTION",
                 "message": str(e),
             }
-        op = exec_resp.get("operationHandle")
-        if not isinstance(op, str):
+        op = extract_operation_handle(exec_resp)
+        if op is None:
             return {
                 "errorType": "NO_OPERATION_HANDLE",
                 "message": "execute returned no handle",
             }
 
-        status, status_payload = await _poll_status(session_handle, op, 60.0, 0.5)
+        # Token 0 doubles as the completion signal and carries the jobID
+        status, status_payload, page0 = await _wait_and_fetch_first_page(
+            session_handle, op, time.monotonic() + 60.0, accept_job_id=True
+        )
         if status != "FINISHED":
-            err: dict[str, Any] = {
-                "errorType": f"OPERATION_{status}",
-                "message": "operation did not finish successfully",
-                "status": status,
-                "statusPayload": status_payload,
-            }
-            try:
-                err_page0 = await client.fetch_result(session_handle, op, token=0)
-                err["errorPage0"] = err_page0
-            except Exception:
-                pass
-            return err
-
-        # Try to read jobID from token 0; if NOT_READY, retry a few times
-        retries = 20
-        jid: str | None = None
-        page0: dict[str, Any] = {}
-        while retries > 0:
-            page0 = await client.fetch_result(session_handle, op, token=0)
-            jid = _extract_job_id(page0)
-            rtype = str(page0.get("resultType") or "").upper()
-            if jid or rtype != "NOT_READY":
-                break
-            await asyncio.sleep(0.25)
-            retries -= 1
+            return _operation_error(status, status_payload, page0)
+
+        jid = _extract_job_id(page0)
         if not isinstance(jid, str):
             return {
                 "errorType": "JOB_ID_NOT_AVAILABLE",
@@ -295,18 +469,27 @@ def build_server(
     async def cancel_job(session_handle: str, job_id: str) -> dict[str, Any]:
         """Issue STOP JOB <job_id> and remove internal tracking state for that job."""
         logger.debug("cancel_job: submitting STOP JOB %s", job_id)
-        stop_status = await _submit_stop_job(session_handle, job_id, 30.0, 0.5)
+        stop_status = await _submit_stop_job(session_handle, job_id, 30.0)
+        last_status: str | None = None
         if stop_status is not None:
             status, payload = stop_status
             logger.debug(
                 "cancel_job: STOP operation status=%s payload=%s", status, payload
             )
-
-        # Wait until job is no longer running according to DESCRIBE JOB
-        logger.debug("cancel_job: waiting for job %s to stop (DESCRIBE JOB)", job_id)
-        job_gone, last_status = await _wait_job_stopped(
-            session_handle, job_id, 60.0, 1.0
-        )
+            if status == "FINISHED":
+                last_status = _stopped_job_status(payload)
+
+        if last_status is not None:
+            # The STOP payload already reports a terminal job state
+            job_gone = True
+        else:
+            # Wait until job is no longer running according to DESCRIBE JOB
+            logger.debug(
+                "cancel_job: waiting for job %s to stop (DESCRIBE JOB)", job_id
+            )
+            job_gone, last_status = await _wait_job_stopped(
+                session_handle, job_id, 60.0
+            )
         logger.debug("cancel_job: job_gone=%s last_status=%s", job_gone, last_status)
 
         return {
@@ -322,8 +505,53 @@ def build_server(
     ) -> dict[str, Any]:
         """Fetch a single page for the given operation handle and token."""
         page = await client.fetch_result(session_handle, operation_handle, token=token)
-        rtype = str(page.get("resultType") or "").upper()
-        return {"page": page, "isEnd": rtype == "EOS", "nextToken": token + 1}
+        rtype = _result_type(page)
+        return {"page": page, "isEnd": rtype == _EOS, "nextToken": token + 1}
+
+    @server.tool()
+    async def fetch_result_pages(
+        session_handle: str,
+        operation_handle: str,
+        token: int,
+        max_pages: int = 10,
+        max_rows: int = 1000,
+        max_wait_ms: int = cfg.fetch_max_wait_ms,
+    ) -> dict[str, Any]:
+        """Fetch consecutive pages starting at token until max_pages, max_rows or EOS.
+
+        Stops early on a NOT_READY page or an error envelope without advancing past
+        it; nextToken then points at the page to retry and the envelope is returned
+        under "error".
+        """
+        pages: list[dict[str, Any]] = []
+        rows_collected = 0
+        is_end = False
+        error: dict[str, Any] | None = None
+        while len(pages) < max_pages and rows_collected < max_rows:
+            page = await client.fetch_result(
+                session_handle, operation_handle, token=token, max_wait_ms=max_wait_ms
+            )
+            rtype = _result_type(page)
+            if rtype not in (_PAYLOAD, _EOS):
+                if rtype != _NOT_READY:
+                    error = page
+                break
+            pages.append(page)
+            try:
+                rows_collected += len(page["results"]["data"])
+            except (KeyError, TypeError):
+                pass
+            token += 1
+            if rtype == _EOS:
+                is_end = True
+                break
+        return {
+            "pages": pages,
+            "nextToken": token,
+            "isEnd": is_end,
+            "rowsCollected": rows_collected,
+            "error": error,
+        }
 
     @server.prompt()
     def manage_session() -> str:
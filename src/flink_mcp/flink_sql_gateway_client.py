@@ -1,11 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import os
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 from httpx import AsyncClient
 
+TERMINAL_STATUSES = frozenset({"FINISHED", "ERROR", "CANCELED", "CLOSED"})
+# The gateway reports these canonical uppercase values; compare against them
+# directly and only normalize case for anything unexpected.
+_OPERATION_STATUSES = TERMINAL_STATUSES | {
+    "INITIALIZED",
+    "PENDING",
+    "RUNNING",
+    "TIMEOUT",
+}
+
+_OP_KEYS = ("operationHandle", "operation_handle")
+_OP_ID_KEYS = ("identifier", "handle", "id", "operationId")
+
+
+def _extract_handle(obj: Any, id_keys: tuple[str, ...]) -> str | None:
+    """Return a handle given as a plain string or as a dict with one of id_keys."""
+    if isinstance(obj, str):
+        return obj
+    if isinstance(obj, dict):
+        for key in id_keys:
+            ident = obj.get(key)
+            if isinstance(ident, str):
+                return ident
+    return None
+
+
+def extract_operation_handle(resp: dict[str, Any]) -> str | None:
+    """Return the operation handle from an execute response, plain or nested."""
+    for key in _OP_KEYS:
+        handle = _extract_handle(resp.get(key), _OP_ID_KEYS)
+        if handle is not None:
+            return handle
+    return None
+
+
+def operation_status(payload: dict[str, Any]) -> str:
+    """Return the operation status, upper-casing only non-canonical values."""
+    status = payload.get("status", "")
+    if isinstance(status, str) and status in _OPERATION_STATUSES:
+        return status
+    return str(status).upper()
+
 
 class FlinkSqlGatewayClient:
     """
@@ -26,7 +72,13 @@ class FlinkSqlGatewayClient:
             "SQL_GATEWAY_API_BASE_URL", "http://localhost:8083"
         )
         self._base_url: str = configured_base_url.rstrip("/")
-        self._client: AsyncClient = client or AsyncClient(timeout=timeout_seconds)
+        # One pooled client per gateway client so polling loops reuse keep-alive connections.
+        self._client: AsyncClient = client or AsyncClient(
+            timeout=httpx.Timeout(timeout_seconds, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=20, max_connections=40, keepalive_expiry=60
+            ),
+        )
 
     def _url(self, path: str) -> str:
         if not path.startswith("/"):
@@ -93,13 +145,18 @@ class FlinkSqlGatewayClient:
         return response.json()
 
     async def get_operation_status(
-        self, session_handle: str, operation_handle: str
+        self, session_handle: str, operation_handle: str, *, wait_ms: int = 0
     ) -> dict[str, Any]:
-        """GET /v3/sessions/{session}/operations/{operation}/status. Returns current status."""
+        """GET /v3/sessions/{session}/operations/{operation}/status. Returns current status.
+
+        A positive wait_ms is forwarded as the waitMs long-poll hint; gateways that
+        do not support it answer immediately.
+        """
         response = await self._client.get(
             self._url(
                 f"/v3/sessions/{session_handle}/operations/{operation_handle}/status"
-            )
+            ),
+            params={"waitMs": wait_ms} if wait_ms > 0 else None,
         )
         response.raise_for_status()
         return response.json()
@@ -110,15 +167,23 @@ class FlinkSqlGatewayClient:
         operation_handle: str,
         *,
         token: int = 0,
+        max_wait_ms: int = 0,
     ) -> dict[str, Any]:
         """
         GET /v3/sessions/{session}/operations/{operation}/result/{token}?rowFormat=JSON.
         Common response fields: resultType (NOT_READY | PAYLOAD | EOS), results, jobID (streaming).
+
+        A positive max_wait_ms is forwarded as the maxWaitMs hint so gateways that
+        support it hold the request until results are ready; others ignore it.
         """
+        params: dict[str, Any] = {"rowFormat": "JSON"}
+        if max_wait_ms > 0:
+            params["maxWaitMs"] = max_wait_ms
         response = await self._client.get(
             self._url(
-                f"/v3/sessions/{session_handle}/operations/{operation_handle}/result/{token}?rowFormat=JSON"
-            )
+                f"/v3/sessions/{session_handle}/operations/{operation_handle}/result/{token}"
+            ),
+            params=params,
         )
         return response.json()
 
@@ -139,6 +204,123 @@ class FlinkSqlGatewayClient:
         except Exception:
             return {"status": "CLOSED"}
 
+    async def watch_operation(
+        self,
+        session_handle: str,
+        operation_handle: str,
+        *,
+        terminal: frozenset[str] = TERMINAL_STATUSES,
+        initial: float = 0.02,
+        maximum: float = 0.5,
+        factor: float = 2.0,
+        wait_ms: int = 5000,
+        deadline: float | None = None,
+        changes_only: bool = True,
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Yield (status, payload) whenever the operation status changes.
+
+        The gateway has no push endpoint, so this long-polls the status resource
+        with the waitMs hint and backs off exponentially from initial to maximum
+        seconds between requests. Ends after yielding a terminal status, or once
+        the optional time.monotonic() deadline passes; waitMs and the backoff are
+        capped at the time left. With changes_only=False every poll is yielded.
+        """
+        interval = initial
+        last_status: str | None = None
+        while True:
+            hint = wait_ms
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                hint = min(wait_ms, int(remaining * 1000))
+            payload = await self.get_operation_status(
+                session_handle, operation_handle, wait_ms=hint
+            )
+            status = operation_status(payload)
+            if status != last_status or not changes_only:
+                last_status = status
+                yield status, payload
+            if status in terminal:
+                return
+            if deadline is not None:
+                await asyncio.sleep(
+                    min(interval, max(0.0, deadline - time.monotonic()))
+                )
+            else:
+                await asyncio.sleep(interval)
+            interval = min(interval * factor, maximum)
+
+    async def wait_for_status(
+        self,
+        session_handle: str,
+        operation_handle: str,
+        *,
+        terminal: frozenset[str] = TERMINAL_STATUSES,
+        timeout: float = 30.0,
+        initial: float = 0.02,
+        maximum: float = 0.5,
+        factor: float = 2.0,
+        wait_ms: int = 5000,
+    ) -> tuple[str, dict[str, Any]]:
+        """Wait until the operation reaches one of the terminal statuses.
+
+        Consumes watch_operation up to a deadline. Returns (status, payload), with
+        status TIMEOUT and the last polled payload if no terminal status was seen
+        within timeout seconds.
+        """
+        payload: dict[str, Any] = {}
+        updates = self.watch_operation(
+            session_handle,
+            operation_handle,
+            terminal=terminal,
+            initial=initial,
+            maximum=maximum,
+            factor=factor,
+            wait_ms=wait_ms,
+            deadline=time.monotonic() + timeout,
+            changes_only=False,
+        )
+        async with contextlib.aclosing(updates):
+            async for status, payload in updates:
+                if status in terminal:
+                    return status, payload
+        return "TIMEOUT", payload
+
+    async def start_and_wait(
+        self,
+        session_handle: str,
+        statement: str,
+        *,
+        timeout: float = 30.0,
+        poll_initial: float = 0.01,
+        poll_max: float = 0.5,
+        factor: float = 2.0,
+    ) -> dict[str, Any]:
+        """Execute a statement and wait for its status via wait_for_status.
+
+        Returns { operationHandle, status, statusPayload }; status is the terminal
+        operation status, or TIMEOUT if none was reached within timeout seconds.
+        """
+        submitted = await self.execute_statement(session_handle, statement)
+        operation_handle = extract_operation_handle(submitted)
+        if operation_handle is None:
+            raise TypeError("execute returned no operation handle")
+
+        status, payload = await self.wait_for_status(
+            session_handle,
+            operation_handle,
+            timeout=timeout,
+            initial=poll_initial,
+            maximum=poll_max,
+            factor=factor,
+        )
+        return {
+            "operationHandle": operation_handle,
+            "status": status,
+            "statusPayload": payload,
+        }
+
     async def aclose(self) -> None:
         """Close underlying HTTP async client."""
         await self._client.aclose()
@@ -4,14 +4,24 @@ This config also skips tests marked "integration" unless explicitly enabled.
 """
 
 import os
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
 
 import httpx
 import pytest
 import pytest_asyncio
-from fastmcp import Client
-from typing import Any
+from fastmcp import Client, FastMCP
+from mock_gateway import (
+    ClientFactory,
+    Responder,
+    Routes,
+    ServerFactory,
+    route,
+    static_json,
+)
 
-from flink_mcp.flink_mcp_server import build_server
+from flink_mcp.flink_mcp_server import FlinkConfig, build_server
+from flink_mcp.flink_sql_gateway_client import FlinkSqlGatewayClient
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -37,106 +47,122 @@ def pytest_collection_modifyitems(
             item.add_marker(skip_integration)
 
 
-def _make_mock_transport() -> httpx.MockTransport:
-    """Provide a minimal mocked Flink SQL Gateway API for non-integration tests."""
+def _mock_gateway_routes() -> dict[tuple[str, str], Responder]:
+    """Routes of a minimal mocked Flink SQL Gateway API, with pre-encoded bodies."""
     session_handle = "sess-mock"
     op_exec = "op-exec"
     op_stop = "op-stop"
-
-    def responder(request: httpx.Request) -> httpx.Response:
-        path = request.url.path
-        method = request.method
-
-        # Open session
-        if method == "POST" and path == "/v3/sessions":
-            return httpx.Response(
-                200, json={"sessionHandle": session_handle, "properties": {}}
-            )
-
-        # Get session
-        if method == "GET" and path == f"/v3/sessions/{session_handle}":
-            return httpx.Response(200, json={"properties": {}})
-
-        # Configure session
-        if (
-            method == "POST"
-            and path == f"/v3/sessions/{session_handle}/configure-session"
-        ):
-            return httpx.Response(200, json={})
-
-        # Execute statements (regular or STOP JOB)
-        if method == "POST" and path == f"/v3/sessions/{session_handle}/statements":
-            body = (request.content or b"").decode("utf-8", errors="ignore").lower()
-            if "stop job" in body:
-                return httpx.Response(200, json={"operationHandle": op_stop})
-            return httpx.Response(200, json={"operationHandle": op_exec})
-
-        # Operation status
-        if (
-            method == "GET"
-            and path == f"/v3/sessions/{session_handle}/operations/{op_exec}/status"
-        ):
-            return httpx.Response(200, json={"status": "FINISHED"})
-        if (
-            method == "GET"
-            and path == f"/v3/sessions/{session_handle}/operations/{op_stop}/status"
-        ):
-            return httpx.Response(200, json={"status": "FINISHED"})
-
-        # Fetch results
-        if (
-            method == "GET"
-            and path == f"/v3/sessions/{session_handle}/operations/{op_exec}/result/0"
-        ):
-            return httpx.Response(
-                200,
-                json={
-                    "resultType": "PAYLOAD",
-                    "results": {
-                        "columns": [{"name": "col1"}],
-                        "data": [{"fields": [1]}],
-                    },
-                    "jobID": "job-1",
+    session_path = f"/v3/sessions/{session_handle}"
+    exec_path = f"{session_path}/operations/{op_exec}"
+    stop_path = f"{session_path}/operations/{op_stop}"
+    finished = static_json({"status": "FINISHED"})
+    exec_handle = static_json({"operationHandle": op_exec})
+    stop_handle = static_json({"operationHandle": op_stop})
+
+    # Execute statements (regular or STOP JOB)
+    def execute(request: httpx.Request) -> httpx.Response:
+        body = (request.content or b"").decode("utf-8", errors="ignore").lower()
+        if "stop job" in body:
+            return stop_handle(request)
+        return exec_handle(request)
+
+    return {
+        ("POST", "/v3/sessions"): static_json(
+            {"sessionHandle": session_handle, "properties": {}}
+        ),
+        ("GET", session_path): static_json({"properties": {}}),
+        ("POST", f"{session_path}/configure-session"): static_json({}),
+        ("POST", f"{session_path}/statements"): execute,
+        ("GET", f"{exec_path}/status"): finished,
+        ("GET", f"{stop_path}/status"): finished,
+        ("GET", f"{exec_path}/result/0"): static_json(
+            {
+                "resultType": "PAYLOAD",
+                "results": {
+                    "columns": [{"name": "col1"}],
+                    "data": [{"fields": [1]}],
                 },
-            )
-        if (
-            method == "GET"
-            and path == f"/v3/sessions/{session_handle}/operations/{op_exec}/result/1"
-        ):
-            return httpx.Response(
-                200,
-                json={
-                    "resultType": "EOS",
-                    "results": {
-                        "columns": [{"name": "col1"}],
-                        "data": [],
-                    },
-                },
-            )
+                "jobID": "job-1",
+            }
+        ),
+        ("GET", f"{exec_path}/result/1"): static_json(
+            {
+                "resultType": "EOS",
+                "results": {"columns": [{"name": "col1"}], "data": []},
+            }
+        ),
+        ("DELETE", f"{exec_path}/close"): static_json({"status": "CLOSED"}),
+    }
+
+
+# Static gateway mock behind the MCP server fixtures.
+_static_gateway_transport = httpx.MockTransport(route(_mock_gateway_routes()))
+
+# Mutable route registry behind the client fixtures; each test installs its own routes.
+_gateway_routes: dict[tuple[str, str], Responder] = {}
+_registry_gateway_transport = httpx.MockTransport(route(_gateway_routes))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def mock_gateway_http() -> AsyncIterator[httpx.AsyncClient]:
+    """One HTTP client on the route-registry transport, shared by the session."""
+    async with httpx.AsyncClient(transport=_registry_gateway_transport) as http:
+        yield http
+
+
+@pytest.fixture
+def gateway_routes() -> Iterator[dict[tuple[str, str], Responder]]:
+    """The (method, path) route registry, emptied before and after each test."""
+    _gateway_routes.clear()
+    yield _gateway_routes
+    _gateway_routes.clear()
 
-        # Close operation
-        if (
-            method == "DELETE"
-            and path == f"/v3/sessions/{session_handle}/operations/{op_exec}/close"
-        ):
-            return httpx.Response(200, json={"status": "CLOSED"})
 
-        # Default: not mocked
-        return httpx.Response(404, json={"message": "not mocked", "path": path})
+@pytest.fixture
+def client_factory(
+    mock_gateway_http: httpx.AsyncClient,
+    gateway_routes: dict[tuple[str, str], Responder],
+) -> ClientFactory:
+    """Install routes and return a gateway client on the shared mock transport."""
 
-    return httpx.MockTransport(responder)
+    def factory(routes: Routes) -> FlinkSqlGatewayClient:
+        gateway_routes.update(routes)
+        return FlinkSqlGatewayClient(base_url="http://mock", client=mock_gateway_http)
+
+    return factory
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def mock_server_http() -> AsyncIterator[httpx.AsyncClient]:
+    """One HTTP client on the static gateway mock, shared by the session."""
+    async with httpx.AsyncClient(transport=_static_gateway_transport) as http:
+        yield http
 
 
 @pytest_asyncio.fixture
-async def client():
+async def client(mock_server_http: httpx.AsyncClient):
     """Create a FastMCP client connected to a mocked server."""
-    transport = _make_mock_transport()
-    http_client = httpx.AsyncClient(transport=transport)
-    server = build_server(base_url="http://mock", http_client=http_client)
+    server = build_server(base_url="http://mock", http_client=mock_server_http)
     async with Client(server) as client:
         yield client
 
 
+@pytest.fixture
+def server_factory(
+    mock_gateway_http: httpx.AsyncClient,
+    gateway_routes: dict[tuple[str, str], Responder],
+) -> ServerFactory:
+    """Install routes and return an MCP server on the shared mock transport."""
+
+    def factory(routes: Routes, config: FlinkConfig | None = None) -> FastMCP:
+        gateway_routes.update(routes)
+        return build_server(
+            base_url="http://mock", http_client=mock_gateway_http, config=config
+        )
+
+    return factory
+
+
 @pytest_asyncio.fixture
 async def session_handle(client: Client[Any]) -> str:
     """Create a session and return the session handle."""
@@ -144,16 +170,24 @@ async def session_handle(client: Client[Any]) -> str:
     return session_result.data["sessionHandle"]
 
 
-@pytest_asyncio.fixture
-async def integration_client():
+@pytest.fixture(scope="module")
+def integration_server() -> FastMCP:
+    """Server for the live gateway, built once per test module (integration)."""
+    return build_server()
+
+
+# The live server's gateway client pools connections on the loop that opened
+# them, so the integration fixtures and tests share one loop per module.
+@pytest_asyncio.fixture(loop_scope="module")
+async def integration_client(integration_server: FastMCP):
     """Client connected to the live server (integration)."""
-    server = build_server()
-    async with Client(server) as c:
+    async with Client(integration_server) as c:
         yield c
 
 
-@pytest_asyncio.fixture
-async def integration_session_handle(integration_client: Client[Any]) -> str:
-    """Create a session on the live server and return its handle."""
-    session_result = await integration_client.call_tool("open_new_session", {})
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def integration_session_handle(integration_server: FastMCP) -> str:
+    """Open one session on the live server per test module and return its handle."""
+    async with Client(integration_server) as c:
+        session_result = await c.call_tool("open_new_session", {})
     return session_result.data["sessionHandle"]
@@ -0,0 +1,37 @@
+"""Route-table helpers and types for mocking the Flink SQL Gateway over httpx."""
+
+import json
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import httpx
+from fastmcp import FastMCP
+
+from flink_mcp.flink_sql_gateway_client import FlinkSqlGatewayClient
+
+Responder = Callable[[httpx.Request], httpx.Response]
+Routes = Mapping[tuple[str, str], Responder]
+ClientFactory = Callable[[Routes], FlinkSqlGatewayClient]
+ServerFactory = Callable[..., FastMCP]
+
+
+def route(routes: Routes) -> Responder:
+    """Build a responder dispatching on (method, path) with one dict lookup."""
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        handler = routes.get((request.method, request.url.path))
+        if handler is None:
+            return httpx.Response(
+                404, json={"message": "not mocked", "path": request.url.path}
+            )
+        return handler(request)
+
+    return responder
+
+
+def static_json(payload: Any, status_code: int = 200) -> Responder:
+    """Serialize payload once and answer each request with a fresh response."""
+    body = json.dumps(payload).encode()
+    return lambda request: httpx.Response(
+        status_code, content=body, headers={"content-type": "application/json"}
+    )
@@ -1,79 +1,94 @@
-from collections.abc import Callable
+from typing import Any
 
 import httpx
 import pytest
+from mock_gateway import ClientFactory, Routes
 
-from flink_mcp.flink_sql_gateway_client import FlinkSqlGatewayClient
-
-
-def _make_mock_client(
-    responder: Callable[[httpx.Request], httpx.Response],
-) -> httpx.AsyncClient:
-    transport = httpx.MockTransport(responder)
-    return httpx.AsyncClient(transport=transport)
-
-
-@pytest.mark.asyncio
-async def test_get_info_mocked() -> None:
-    def responder(request: httpx.Request) -> httpx.Response:
-        assert request.method == "GET"
-        assert request.url.path == "/v3/info"
-        return httpx.Response(
-            200, json={"productName": "Apache Flink", "version": "test"}
-        )
-
-    client = FlinkSqlGatewayClient(
-        base_url="http://mock", client=_make_mock_client(responder)
-    )
-    info = await client.get_info()
-    assert isinstance(info, dict)
-    assert info.get("version") == "test"
+pytestmark = [pytest.mark.asyncio, pytest.mark.unit]
 
 
-@pytest.mark.asyncio
-async def test_statement_flow_mocked() -> None:
+@pytest.mark.parametrize(
+    ("method_name", "args", "route", "sent", "body"),
+    [
+        (
+            "get_info",
+            (),
+            ("GET", "/v3/info"),
+            None,
+            {"productName": "Apache Flink", "version": "test"},
+        ),
+        (
+            "get_session",
+            ("sess-1",),
+            ("GET", "/v3/sessions/sess-1"),
+            None,
+            {"properties": {}},
+        ),
+        (
+            "configure_session",
+            ("sess-abc", "USE CATALOG default_catalog"),
+            ("POST", "/v3/sessions/sess-abc/configure-session"),
+            b"statement",
+            {},
+        ),
+        (
+            "close_operation",
+            ("sess-1", "op-2"),
+            ("DELETE", "/v3/sessions/sess-1/operations/op-2/close"),
+            None,
+            {"status": "CLOSED"},
+        ),
+    ],
+)
+async def test_simple_endpoint_mocked(
+    client_factory: ClientFactory,
+    method_name: str,
+    args: tuple[str, ...],
+    route: tuple[str, str],
+    sent: bytes | None,
+    body: dict[str, Any],
+) -> None:
+    requests: list[httpx.Request] = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=body)
+
+    client = client_factory({route: respond})
+    resp = await getattr(client, method_name)(*args)
+    assert resp == body
+    assert len(requests) == 1
+    if sent is not None:
+        assert sent in requests[0].content
+
+
+async def test_statement_flow_mocked(client_factory: ClientFactory) -> None:
     session_handle = "session-123"
     operation_handle = "op-456"
 
-    def responder(request: httpx.Request) -> httpx.Response:
-        # Create session
-        if request.method == "POST" and request.url.path == "/v3/sessions":
-            return httpx.Response(
-                200, json={"sessionHandle": session_handle, "properties": {}}
-            )
-
-        # Submit statement
-        if (
-            request.method == "POST"
-            and request.url.path == f"/v3/sessions/{session_handle}/statements"
-        ):
-            body = request.content
-            assert body and b"statement" in body
-            return httpx.Response(200, json={"operationHandle": operation_handle})
-
-        # Operation status
-        if (
-            request.method == "GET"
-            and request.url.path
-            == f"/v3/sessions/{session_handle}/operations/{operation_handle}/status"
-        ):
-            return httpx.Response(200, json={"status": {"status": "FINISHED"}})
-
-        # Fetch result page 0
-        if (
-            request.method == "GET"
-            and request.url.path
-            == f"/v3/sessions/{session_handle}/operations/{operation_handle}/result/0"
-        ):
-            # Optionally ensure rowFormat=JSON is requested
-            assert b"rowFormat=JSON" in (request.url.query or b"")
-            return httpx.Response(200, json={"result": "ok", "data": [[1]]})
-
-        return httpx.Response(404, json={"message": "not mocked"})
-
-    client = FlinkSqlGatewayClient(
-        base_url="http://mock", client=_make_mock_client(responder)
-    )
+    def submit_statement(request: httpx.Request) -> httpx.Response:
+        body = request.content
+        assert body and b"statement" in body
+        return httpx.Response(200, json={"operationHandle": operation_handle})
+
+    def fetch_page0(request: httpx.Request) -> httpx.Response:
+        # Optionally ensure rowFormat=JSON is requested
+        assert b"rowFormat=JSON" in (request.url.query or b"")
+        return httpx.Response(200, json={"result": "ok", "data": [[1]]})
+
+    operation_path = f"/v3/sessions/{session_handle}/operations/{operation_handle}"
+    routes: Routes = {
+        ("POST", "/v3/sessions"): lambda r: httpx.Response(
+            200, json={"sessionHandle": session_handle, "properties": {}}
+        ),
+        ("POST", f"/v3/sessions/{session_handle}/statements"): submit_statement,
+        ("GET", f"{operation_path}/status"): lambda r: httpx.Response(
+            200, json={"status": {"status": "FINISHED"}}
+        ),
+        ("GET", f"{operation_path}/result/0"): fetch_page0,
+    }
+
+    client = client_factory(routes)
 
     created = await client.open_session()
     assert created.get("sessionHandle") == session_handle
@@ -88,50 +103,85 @@ async def test_statement_flow_mocked() -> None:
     assert result.get("result") == "ok"
 
 
-@pytest.mark.asyncio
-async def test_configure_session_mocked() -> None:
-    session_handle = "sess-abc"
+async def test_fetch_result_forwards_max_wait_hint(
+    client_factory: ClientFactory,
+) -> None:
+    def page(request: httpx.Request) -> httpx.Response:
+        assert request.url.params.get("rowFormat") == "JSON"
+        assert request.url.params.get("maxWaitMs") == "1000"
+        return httpx.Response(200, json={"resultType": "EOS"})
+
+    client = client_factory({("GET", "/v3/sessions/s/operations/o/result/3"): page})
+    page = await client.fetch_result("s", "o", token=3, max_wait_ms=1000)
+    assert page.get("resultType") == "EOS"
+
+
+async def test_start_and_wait_backs_off_until_finished(
+    client_factory: ClientFactory,
+) -> None:
+    statuses = iter(["PENDING", "RUNNING", "RUNNING", "FINISHED"])
+    routes: Routes = {
+        ("POST", "/v3/sessions/s/statements"): lambda r: httpx.Response(
+            200, json={"operationHandle": {"sessionId": "s", "identifier": "o"}}
+        ),
+        ("GET", "/v3/sessions/s/operations/o/status"): lambda r: httpx.Response(
+            200, json={"status": next(statuses)}
+        ),
+    }
+
+    client = client_factory(routes)
+    started = await client.start_and_wait(
+        "s", "SELECT 1", poll_initial=0.001, poll_max=0.002
+    )
+    assert started == {
+        "operationHandle": "o",
+        "status": "FINISHED",
+        "statusPayload": {"status": "FINISHED"},
+    }
+
+
+async def test_wait_for_status_sends_long_poll_hint(
+    client_factory: ClientFactory,
+) -> None:
+    statuses = iter(["RUNNING", "CANCELED"])
+
+    def status(request: httpx.Request) -> httpx.Response:
+        wait_ms = int(request.url.params["waitMs"])
+        assert 0 < wait_ms <= 1000  # capped at the time left
+        return httpx.Response(200, json={"status": next(statuses)})
+
+    client = client_factory({("GET", "/v3/sessions/s/operations/o/status"): status})
+    result = await client.wait_for_status(
+        "s", "o", terminal=frozenset({"CANCELED"}), timeout=1.0, initial=0.001
+    )
+    assert result == ("CANCELED", {"status": "CANCELED"})
 
-    def responder(request: httpx.Request) -> httpx.Response:
-        if request.method == "POST" and request.url.path == "/v3/sessions":
-            return httpx.Response(200, json={"sessionHandle": session_handle})
-        if (
-            request.method == "POST"
-            and request.url.path == f"/v3/sessions/{session_handle}/configure-session"
-        ):
-            assert request.content and b"statement" in request.content
-            return httpx.Response(200, json={})
-        return httpx.Response(404)
 
-    client = FlinkSqlGatewayClient(
-        base_url="http://mock", client=_make_mock_client(responder)
-    )
-    created = await client.open_session()
-    assert created.get("sessionHandle") == session_handle
-    resp = await client.configure_session(session_handle, "USE CATALOG default_catalog")
-    assert isinstance(resp, dict)
-
-
-@pytest.mark.asyncio
-async def test_close_operation_mocked() -> None:
-    session_handle = "sess-1"
-    operation_handle = "op-2"
-
-    def responder(request: httpx.Request) -> httpx.Response:
-        if (
-            request.method == "DELETE"
-            and request.url.path
-            == f"/v3/sessions/{session_handle}/operations/{operation_handle}/close"
-        ):
-            return httpx.Response(200, json={"status": "CLOSED"})
-        return httpx.Response(404)
-
-    client = FlinkSqlGatewayClient(
-        base_url="http://mock", client=_make_mock_client(responder)
+async def test_watch_operation_yields_status_changes(
+    client_factory: ClientFactory,
+) -> None:
+    statuses = iter(["PENDING", "RUNNING", "RUNNING", "FINISHED"])
+    client = client_factory(
+        {
+            ("GET", "/v3/sessions/s/operations/o/status"): lambda r: httpx.Response(
+                200, json={"status": next(statuses)}
+            )
+        }
     )
-    resp = await client.close_operation(session_handle, operation_handle)
-    assert isinstance(resp, dict)
+    seen = [
+        status async for status, _ in client.watch_operation("s", "o", initial=0.001)
+    ]
+    assert seen == ["PENDING", "RUNNING", "FINISHED"]
 
 
-# MCP Server tests using in-memory testing approach
-pytestmark = [pytest.mark.asyncio, pytest.mark.unit]
+async def test_wait_for_status_times_out(client_factory: ClientFactory) -> None:
+    polls: list[int] = []
+
+    def status(request: httpx.Request) -> httpx.Response:
+        polls.append(len(polls))
+        return httpx.Response(200, json={"status": "RUNNING", "poll": polls[-1]})
+
+    client = client_factory({("GET", "/v3/sessions/s/operations/o/status"): status})
+    result = await client.wait_for_status("s", "o", timeout=0.02, initial=0.001)
+    assert len(polls) > 1
+    assert result == ("TIMEOUT", {"status": "RUNNING", "poll": polls[-1]})
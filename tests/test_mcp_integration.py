@@ -1,8 +1,9 @@
-import pytest
-from fastmcp import Client
-
 from typing import Any
 
+import pytest
+import pytest_asyncio
+from fastmcp import Client, FastMCP
+
 
 async def _ensure_datagen_table(client: Client[Any], session_handle: str) -> None:
     """Create a temporary unbounded datagen table for streaming"""
@@ -24,7 +25,17 @@ async def _ensure_datagen_table(client: Client[Any], session_handle: str) -> Non
     )
 
 
-@pytest.mark.asyncio
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def datagen_session_handle(
+    integration_server: FastMCP, integration_session_handle: str
+) -> str:
+    """Module session with the datagen table created once."""
+    async with Client(integration_server) as c:
+        await _ensure_datagen_table(c, integration_session_handle)
+    return integration_session_handle
+
+
+@pytest.mark.asyncio(loop_scope="module")
 @pytest.mark.integration
 async def test_run_query_collect_and_stop_success(
     integration_client: Client[Any], integration_session_handle: str
@@ -45,19 +56,16 @@ async def test_run_query_collect_and_stop_success(
     assert "data" in result_data
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 @pytest.mark.integration
 async def test_run_query_stream_start_with_datagen_then_cancel(
-    integration_client: Client[Any], integration_session_handle: str
+    integration_client: Client[Any], datagen_session_handle: str
 ) -> None:
-    # Setup datagen table
-    await _ensure_datagen_table(integration_client, integration_session_handle)
-
     # Start streaming query
     start_result = await integration_client.call_tool(
         "run_query_stream_start",
         {
-            "session_handle": integration_session_handle,
+            "session_handle": datagen_session_handle,
             "query": "SELECT id, ts FROM gen_stream",
         },
     )
@@ -78,7 +86,7 @@ async def test_run_query_stream_start_with_datagen_then_cancel(
     page_result = await integration_client.call_tool(
         "fetch_result_page",
         {
-            "session_handle": integration_session_handle,
+            "session_handle": datagen_session_handle,
             "operation_handle": op,
             "token": 1,
         },
@@ -88,7 +96,7 @@ async def test_run_query_stream_start_with_datagen_then_cancel(
 
     # Cancel job
     cancel_result = await integration_client.call_tool(
-        "cancel_job", {"session_handle": integration_session_handle, "job_id": job_id}
+        "cancel_job", {"session_handle": datagen_session_handle, "job_id": job_id}
     )
 
     cancel_data = cancel_result.data
@@ -96,7 +104,7 @@ async def test_run_query_stream_start_with_datagen_then_cancel(
     assert cancel_data.get("jobGone") is True
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 @pytest.mark.integration
 async def test_run_query_collect_and_stop_error_flow(
     integration_client: Client[Any], integration_session_handle: str
@@ -121,7 +129,7 @@ async def test_run_query_collect_and_stop_error_flow(
     )
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 @pytest.mark.integration
 async def test_run_query_stream_start_error_flow(
     integration_client: Client[Any], integration_session_handle: str
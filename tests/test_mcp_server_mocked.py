@@ -1,17 +1,48 @@
+import asyncio
+from typing import Any
+
+import httpx
 import pytest
-from unittest.mock import Mock
+from fastmcp import Client
+from mock_gateway import ClientFactory, ServerFactory, static_json
+
+from flink_mcp.flink_mcp_server import FlinkConfig, _from_env, build_server
 
 pytestmark = [pytest.mark.asyncio, pytest.mark.unit]
 
 
-async def test_mcp_server_open_session(client: Mock) -> None:
+STATEMENTS = ("POST", "/v3/sessions/s/statements")
+
+
+@pytest.mark.parametrize(
+    ("env", "variable"),
+    [
+        ({"FLINK_POLL_INITIAL": "0"}, "FLINK_POLL_INITIAL"),
+        ({"FLINK_POLL_INITIAL": "-1"}, "FLINK_POLL_INITIAL"),
+        ({"FLINK_POLL_INITIAL": "fast"}, "FLINK_POLL_INITIAL"),
+        ({"FLINK_POLL_INITIAL": "1", "FLINK_POLL_MAX": "0.5"}, "FLINK_POLL_MAX"),
+        ({"FLINK_FETCH_MAX_WAIT_MS": "-1"}, "FLINK_FETCH_MAX_WAIT_MS"),
+        ({"FLINK_FETCH_MAX_WAIT_MS": "1.5"}, "FLINK_FETCH_MAX_WAIT_MS"),
+    ],
+)
+async def test_mcp_server_rejects_invalid_poll_settings(
+    monkeypatch: pytest.MonkeyPatch, env: dict[str, str], variable: str
+) -> None:
+    """Invalid polling settings fail fast with the offending variable named."""
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=variable):
+        _from_env()
+
+
+async def test_mcp_server_open_session(client: Client[Any]) -> None:
     """Open a session through MCP server (mocked backend)."""
     result = await client.call_tool("open_new_session", {})
     data = result.data
     assert "sessionHandle" in data and isinstance(data["sessionHandle"], str)
 
 
-async def test_mcp_server_get_config(client: Mock, session_handle: str) -> None:
+async def test_mcp_server_get_config(client: Client[Any], session_handle: str) -> None:
     """Get session config through MCP server (mocked backend)."""
     config_result = await client.call_tool(
         "get_config", {"session_handle": session_handle}
@@ -19,7 +50,9 @@ async def test_mcp_server_get_config(client: Mock, session_handle: str) -> None:
     assert isinstance(config_result.data, dict)
 
 
-async def test_mcp_server_configure_session(client: Mock, session_handle: str) -> None:
+async def test_mcp_server_configure_session(
+    client: Client[Any], session_handle: str
+) -> None:
     """Configure a session through MCP server (mocked backend)."""
     res = await client.call_tool(
         "configure_session",
@@ -31,7 +64,9 @@ async def test_mcp_server_configure_session(client: Mock, session_handle: str) -
     assert not res.is_error
 
 
-async def test_mcp_server_fetch_result_page(client: Mock, session_handle: str) -> None:
+async def test_mcp_server_fetch_result_page(
+    client: Client[Any], session_handle: str
+) -> None:
     """Fetch two pages and assert pagination contract via MCP server (mocked backend)."""
     start = await client.call_tool(
         "run_query_stream_start",
@@ -56,3 +91,365 @@ async def test_mcp_server_fetch_result_page(client: Mock, session_handle: str) -
     p1 = page1.data
     assert p1.get("isEnd") is True
     assert p1.get("nextToken") == 2
+
+
+async def test_mcp_server_fetch_result_pages(
+    client: Client[Any], session_handle: str
+) -> None:
+    """Fetch all pages of an operation in a single tool call (mocked backend)."""
+    start = await client.call_tool(
+        "run_query_stream_start",
+        {"session_handle": session_handle, "query": "SELECT 1"},
+    )
+    op = start.data.get("operationHandle")
+
+    res = await client.call_tool(
+        "fetch_result_pages",
+        {"session_handle": session_handle, "operation_handle": op, "token": 0},
+    )
+    data = res.data
+    assert len(data["pages"]) == 2
+    assert data["isEnd"] is True
+    assert data["nextToken"] == 2
+    assert data["rowsCollected"] == 1
+    assert data["error"] is None
+
+
+async def test_mcp_server_fetch_result_pages_stops_on_error(
+    server_factory: ServerFactory,
+) -> None:
+    """An error envelope ends the batch without advancing nextToken past it."""
+    server = server_factory(
+        {
+            ("GET", "/v3/sessions/s/operations/op/result/0"): static_json(
+                {"resultType": "PAYLOAD", "results": {"data": [{"fields": [1]}]}}
+            ),
+            ("GET", "/v3/sessions/s/operations/op/result/1"): static_json(
+                {"errors": ["Job failed"]}, 500
+            ),
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "fetch_result_pages",
+            {"session_handle": "s", "operation_handle": "op", "token": 0},
+        )
+    data = result.data
+    assert len(data["pages"]) == 1
+    assert data["nextToken"] == 1
+    assert data["isEnd"] is False
+    assert data["error"] == {"errors": ["Job failed"]}
+
+
+async def test_mcp_server_waits_for_results_with_backoff(
+    server_factory: ServerFactory,
+) -> None:
+    """NOT_READY pages are retried with backoff; no separate status polling."""
+    calls = {"status": 0, "fetch": 0}
+
+    def status(request: httpx.Request) -> httpx.Response:
+        calls["status"] += 1
+        return httpx.Response(200, json={"status": "FINISHED"})
+
+    def result(request: httpx.Request) -> httpx.Response:
+        calls["fetch"] += 1
+        if calls["fetch"] < 4:
+            return httpx.Response(200, json={"resultType": "NOT_READY"})
+        return httpx.Response(
+            200,
+            json={
+                "resultType": "EOS",
+                "results": {"columns": [{"name": "c"}], "data": [{"fields": [1]}]},
+            },
+        )
+
+    server = server_factory(
+        {
+            STATEMENTS: static_json({"operationHandle": "op"}),
+            ("GET", "/v3/sessions/s/operations/op/status"): status,
+            ("GET", "/v3/sessions/s/operations/op/result/0"): result,
+        },
+        config=FlinkConfig(poll_initial=0.001, poll_max=0.004),
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_collect_and_stop",
+            {"session_handle": "s", "query": "SELECT 1", "max_seconds": 5.0},
+        )
+    assert calls == {"status": 0, "fetch": 4}
+    assert result.data["data"] == [{"fields": [1]}]
+
+
+async def test_mcp_server_collect_honours_zero_max_rows(
+    server_factory: ServerFactory,
+) -> None:
+    """max_rows=0 stops after the first page instead of fetching until timeout."""
+    fetched: list[str] = []
+
+    def page(request: httpx.Request) -> httpx.Response:
+        fetched.append(request.url.path.rsplit("/", 1)[-1])
+        return httpx.Response(
+            200,
+            json={"resultType": "PAYLOAD", "results": {"data": [{"fields": [1]}]}},
+        )
+
+    server = server_factory(
+        {
+            STATEMENTS: static_json({"operationHandle": "op"}),
+            ("GET", "/v3/sessions/s/operations/op/result/0"): page,
+            ("GET", "/v3/sessions/s/operations/op/result/1"): page,
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_collect_and_stop",
+            {"session_handle": "s", "query": "SELECT 1", "max_rows": 0},
+        )
+    assert result.data["data"] == []
+    assert fetched == ["0"]
+
+
+async def test_mcp_server_stream_start_uses_single_fetch_loop(
+    server_factory: ServerFactory,
+) -> None:
+    """Stream start waits on token 0 with the long-poll hint and never polls status."""
+    fetches: list[httpx.Request] = []
+    status_calls: list[httpx.Request] = []
+
+    def result(request: httpx.Request) -> httpx.Response:
+        fetches.append(request)
+        if len(fetches) < 3:
+            return httpx.Response(200, json={"resultType": "NOT_READY"})
+        return httpx.Response(200, json={"resultType": "PAYLOAD", "jobID": "j"})
+
+    def status(request: httpx.Request) -> httpx.Response:
+        status_calls.append(request)
+        return httpx.Response(200, json={"status": "FINISHED"})
+
+    server = server_factory(
+        {
+            STATEMENTS: static_json({"operationHandle": "op"}),
+            ("GET", "/v3/sessions/s/operations/op/status"): status,
+            ("GET", "/v3/sessions/s/operations/op/result/0"): result,
+        },
+        config=FlinkConfig(poll_initial=0.001, poll_max=0.004),
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_stream_start", {"session_handle": "s", "query": "SELECT 1"}
+        )
+    assert result.data == {"jobID": "j", "operationHandle": "op"}
+    assert len(fetches) == 3
+    assert all(r.url.params.get("maxWaitMs") == "1000" for r in fetches)
+    assert not status_calls
+
+
+async def test_mcp_server_reports_operation_error(
+    server_factory: ServerFactory,
+) -> None:
+    """A gateway error envelope on the first fetch surfaces as OPERATION_ERROR."""
+    server = server_factory(
+        {
+            STATEMENTS: static_json({"operationHandle": "op"}),
+            ("GET", "/v3/sessions/s/operations/op/status"): static_json(
+                {"status": "ERROR"}
+            ),
+            ("GET", "/v3/sessions/s/operations/op/result/0"): static_json(
+                {"errors": ["Table not found"]}, 500
+            ),
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_stream_start", {"session_handle": "s", "query": "SELECT 1"}
+        )
+    assert result.data["errorType"] == "OPERATION_ERROR"
+    assert result.data["errorPage0"] == {"errors": ["Table not found"]}
+
+
+async def test_mcp_server_cancel_job_reads_describe_job_status(
+    server_factory: ServerFactory,
+) -> None:
+    """cancel_job reads the status column of DESCRIBE JOB by name."""
+
+    def execute(request: httpx.Request) -> httpx.Response:
+        op = "op-stop" if "STOP JOB" in request.content.decode() else "op-describe"
+        return httpx.Response(200, json={"operationHandle": op})
+
+    finished = static_json({"status": "FINISHED"})
+    server = server_factory(
+        {
+            STATEMENTS: execute,
+            ("GET", "/v3/sessions/s/operations/op-stop/status"): finished,
+            ("GET", "/v3/sessions/s/operations/op-describe/status"): finished,
+            ("GET", "/v3/sessions/s/operations/op-describe/result/0"): static_json(
+                {
+                    "resultType": "EOS",
+                    "results": {
+                        "columns": [
+                            {"name": "job id"},
+                            {"name": "job name"},
+                            {"name": " Status "},
+                        ],
+                        "data": [{"fields": ["job-1", "select", "CANCELED"]}],
+                    },
+                }
+            ),
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "cancel_job", {"session_handle": "s", "job_id": "job-1"}
+        )
+    assert result.data["jobGone"] is True
+    assert result.data["jobStatus"] == "CANCELED"
+
+
+async def test_mcp_server_cancel_job_trusts_stop_payload(
+    server_factory: ServerFactory,
+) -> None:
+    """A terminal jobStatus in the STOP payload skips DESCRIBE JOB polling."""
+    statements: list[str] = []
+
+    def execute(request: httpx.Request) -> httpx.Response:
+        statements.append(request.content.decode())
+        return httpx.Response(200, json={"operationHandle": "op-stop"})
+
+    server = server_factory(
+        {
+            STATEMENTS: execute,
+            ("GET", "/v3/sessions/s/operations/op-stop/status"): static_json(
+                {"status": "FINISHED", "jobStatus": "CANCELED"}
+            ),
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "cancel_job", {"session_handle": "s", "job_id": "job-1"}
+        )
+    assert result.data["jobGone"] is True
+    assert result.data["jobStatus"] == "CANCELED"
+    assert len(statements) == 1 and "STOP JOB" in statements[0]
+
+
+async def test_mcp_server_uses_injected_gateway_client(
+    client_factory: ClientFactory,
+) -> None:
+    """An injected FlinkSqlGatewayClient is used as-is by the server."""
+
+    def open_session(request: httpx.Request) -> httpx.Response:
+        assert request.url.host == "mock"
+        return httpx.Response(200, json={"sessionHandle": "s"})
+
+    gateway = client_factory({("POST", "/v3/sessions"): open_session})
+    server = build_server(client=gateway)
+    async with Client(server) as c:
+        result = await c.call_tool("open_new_session", {})
+    assert result.data["sessionHandle"] == "s"
+
+
+@pytest.mark.parametrize("argument", ["base_url", "http_client"])
+async def test_mcp_server_rejects_client_with_connection_args(
+    client_factory: ClientFactory, mock_gateway_http: httpx.AsyncClient, argument: str
+) -> None:
+    """An injected client cannot be combined with base_url or http_client."""
+    gateway = client_factory({})
+    value = {"base_url": "http://other", "http_client": mock_gateway_http}[argument]
+    with pytest.raises(TypeError):
+        build_server(client=gateway, **{argument: value})
+
+
+async def test_mcp_server_closes_operation_in_background(
+    server_factory: ServerFactory,
+) -> None:
+    """run_query_collect_and_stop still closes the operation, off the response path."""
+    closed = asyncio.Event()
+
+    def close(request: httpx.Request) -> httpx.Response:
+        closed.set()
+        return httpx.Response(200, json={"status": "CLOSED"})
+
+    server = server_factory(
+        {
+            STATEMENTS: static_json({"operationHandle": "op"}),
+            ("GET", "/v3/sessions/s/operations/op/result/0"): static_json(
+                {"resultType": "EOS"}
+            ),
+            ("DELETE", "/v3/sessions/s/operations/op/close"): close,
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_collect_and_stop", {"session_handle": "s", "query": "SELECT 1"}
+        )
+        await asyncio.wait_for(closed.wait(), timeout=1.0)
+    assert result.data == {"columns": [], "data": []}
+
+
+async def test_mcp_server_collect_stops_job_then_closes_operation(
+    server_factory: ServerFactory,
+) -> None:
+    """A jobID on page 0 is stopped and its STOP polled before the close is sent."""
+    events: list[str] = []
+    closed = asyncio.Event()
+
+    def execute(request: httpx.Request) -> httpx.Response:
+        statement = request.content.decode()
+        if "STOP JOB" in statement:
+            events.append(f"submit {statement}")
+            return httpx.Response(200, json={"operationHandle": "op-stop"})
+        return httpx.Response(200, json={"operationHandle": "op"})
+
+    def stop_status(request: httpx.Request) -> httpx.Response:
+        events.append("stop status")
+        return httpx.Response(200, json={"status": "FINISHED"})
+
+    def close(request: httpx.Request) -> httpx.Response:
+        events.append("close")
+        closed.set()
+        return httpx.Response(200, json={"status": "CLOSED"})
+
+    server = server_factory(
+        {
+            STATEMENTS: execute,
+            ("GET", "/v3/sessions/s/operations/op/result/0"): static_json(
+                {
+                    "resultType": "EOS",
+                    "jobID": "job-7",
+                    "results": {"columns": [{"name": "c"}], "data": [{"fields": [1]}]},
+                }
+            ),
+            ("GET", "/v3/sessions/s/operations/op-stop/status"): stop_status,
+            ("DELETE", "/v3/sessions/s/operations/op/close"): close,
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_collect_and_stop", {"session_handle": "s", "query": "SELECT 1"}
+        )
+        await asyncio.wait_for(closed.wait(), timeout=1.0)
+    assert result.data["data"] == [{"fields": [1]}]
+    assert len(events) == 3
+    assert events[0].startswith("submit ") and "STOP JOB 'job-7'" in events[0]
+    assert events[1:] == ["stop status", "close"]
+
+
+async def test_mcp_server_accepts_nested_operation_handle(
+    server_factory: ServerFactory,
+) -> None:
+    """Wrapped operation handles yield the operation ID, never the session ID."""
+    server = server_factory(
+        {
+            STATEMENTS: static_json(
+                {"operationHandle": {"sessionId": "s", "operationId": "op"}}
+            ),
+            ("GET", "/v3/sessions/s/operations/op/result/0"): static_json(
+                {"resultType": "PAYLOAD", "jobID": "j"}
+            ),
+        }
+    )
+    async with Client(server) as c:
+        result = await c.call_tool(
+            "run_query_stream_start", {"session_handle": "s", "query": "SELECT 1"}
+        )
+    assert result.data == {"jobID": "j", "operationHandle": "op"}